@@ -6,17 +6,27 @@ This script collects dark anime images from the web to use as backgrounds for mo
 
 import os
 import random
+import threading
 import time
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, quote_plus
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin, quote_plus, urlparse
 import json
+import numpy as np
 from PIL import Image
 from io import BytesIO
 
 # Create directories if they don't exist
 os.makedirs("images", exist_ok=True)
 
+# Prefer the much faster lxml parser when it is installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
 class ImageCollector:
     def __init__(self, search_terms=None, save_dir="images"):
         """Initialize the image collector with search terms and save directory."""
@@ -25,7 +35,13 @@ class ImageCollector:
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-        
+        # Shared session so concurrent downloads reuse TCP/TLS connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Per-host rate limiting state (replaces the global 1s sleep)
+        self._throttle_lock = threading.Lock()
+        self._next_request_time = {}
+
     def search_unsplash(self, query, num_images=5):
         """Search Unsplash for images."""
         print(f"Searching Unsplash for '{query}'...")
@@ -36,14 +52,15 @@ class ImageCollector:
             response = requests.get(url, headers=self.headers)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            img_tags = soup.find_all('img', class_='YVj9w')
-            
+            # Feed raw bytes so the parser can detect the encoding itself
+            soup = BeautifulSoup(response.content, HTML_PARSER)
+
             image_urls = []
-            for img in img_tags[:num_images]:
-                if 'src' in img.attrs:
-                    image_urls.append(img['src'])
-            
+            for img in soup.select('img.YVj9w')[:num_images]:
+                src = img.get('src')
+                if src:
+                    image_urls.append(src)
+
             return image_urls
         except Exception as e:
             print(f"Error searching Unsplash: {e}")
@@ -59,35 +76,70 @@ class ImageCollector:
             response = requests.get(url, headers=self.headers)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            img_tags = soup.find_all('img', class_='photo-item__img')
-            
+            # Feed raw bytes so the parser can detect the encoding itself
+            soup = BeautifulSoup(response.content, HTML_PARSER)
+
             image_urls = []
-            for img in img_tags[:num_images]:
-                if 'src' in img.attrs:
-                    image_urls.append(img['src'])
-                elif 'data-big-src' in img.attrs:
-                    image_urls.append(img['data-big-src'])
-            
+            for img in soup.select('img.photo-item__img')[:num_images]:
+                src = img.get('src') or img.get('data-big-src')
+                if src:
+                    image_urls.append(src)
+
             return image_urls
         except Exception as e:
             print(f"Error searching Pexels: {e}")
             return []
 
+    def _throttle(self, url):
+        """Wait until the host of the given URL is ready for another request."""
+        host = urlparse(url).netloc
+        with self._throttle_lock:
+            now = time.monotonic()
+            ready = max(now, self._next_request_time.get(host, now))
+            self._next_request_time[host] = ready + 1.0
+        wait = ready - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _probe_image_size(self, url):
+        """Get image dimensions from just the first few KB via an HTTP Range request."""
+        try:
+            self._throttle(url)
+            response = self.session.get(url, headers={'Range': 'bytes=0-4095'}, stream=True)
+            response.raise_for_status()
+            with response:
+                head = response.raw.read(4096)
+            # Pillow reads the size from the header without decoding pixels
+            return Image.open(BytesIO(head)).size
+        except Exception:
+            # Server ignored the range or the header was incomplete; fall
+            # back to checking the size during the full download
+            return None
+
     def download_image(self, url, filename):
         """Download an image from a URL and save it to the specified filename."""
         try:
-            response = requests.get(url, headers=self.headers)
+            # Reject undersized images from their header bytes alone before
+            # committing to a full download
+            size = self._probe_image_size(url)
+            if size and (size[0] < 640 or size[1] < 640):
+                print(f"Image too small: {size[0]}x{size[1]}")
+                return False
+
+            # Be nice to the server, but only block requests to the same host
+            self._throttle(url)
+            response = self.session.get(url)
             response.raise_for_status()
-            
+
             # Check if the image is valid
             img = Image.open(BytesIO(response.content))
-            
-            # Check if the image is large enough (minimum 640x640)
+
+            # Check if the image is large enough (minimum 640x640); this also
+            # covers hosts that ignored the Range probe above
             if img.width < 640 or img.height < 640:
                 print(f"Image too small: {img.width}x{img.height}")
                 return False
-            
+
             # Save the image
             img.save(filename)
             print(f"Downloaded: {filename}")
@@ -96,60 +148,63 @@ class ImageCollector:
             print(f"Error downloading {url}: {e}")
             return False
 
-    def is_dark_image(self, img_path, threshold=100):
+    def is_dark_image(self, img_path, threshold=80, min_dark_fraction=0.7):
         """Check if an image is dark enough to be used as a background."""
         try:
-            img = Image.open(img_path).convert('L')  # Convert to grayscale
-            avg_brightness = sum(img.getdata()) / len(img.getdata())
-            return avg_brightness < threshold
+            img = Image.open(img_path)
+            # Ask the JPEG decoder for a scaled-down decode; the threshold check
+            # doesn't need full resolution
+            img.draft('L', (512, 512))
+            img = img.convert('L')  # Convert to grayscale
+            # Sample every 8th pixel in each direction instead of resampling a
+            # thumbnail; the estimated dark fraction is statistically the same
+            # at 64x less pixel work. Requiring a fraction of genuinely dark
+            # pixels matches the "dark aesthetic" criterion better than a
+            # single mean brightness
+            sampled = np.asarray(img)[::8, ::8]
+            dark_fraction = (sampled < threshold).mean()
+            return dark_fraction >= min_dark_fraction
         except Exception as e:
             print(f"Error checking image brightness: {e}")
             return False
 
     def collect_images(self, num_images=15):
         """Collect images from various sources based on search terms."""
-        collected_count = 0
-        
+        # Run all searches first so the downloads can be dispatched in one batch
+        urls = []
+        seen = set()
         for term in self.search_terms:
-            if collected_count >= num_images:
-                break
-                
-            # Try Unsplash
-            unsplash_urls = self.search_unsplash(term, num_images=5)
-            for i, url in enumerate(unsplash_urls):
-                if collected_count >= num_images:
-                    break
-                    
-                filename = os.path.join(self.save_dir, f"dark_anime_{collected_count+1}.jpg")
-                if self.download_image(url, filename):
-                    # Check if the image is dark enough
-                    if self.is_dark_image(filename):
-                        collected_count += 1
-                    else:
-                        print(f"Image not dark enough, removing: {filename}")
-                        os.remove(filename)
-                
-                # Be nice to the server
-                time.sleep(1)
-            
-            # Try Pexels
-            pexels_urls = self.search_pexels(term, num_images=5)
-            for i, url in enumerate(pexels_urls):
+            for url in self.search_unsplash(term, num_images=5) + self.search_pexels(term, num_images=5):
+                if url not in seen:
+                    seen.add(url)
+                    urls.append(url)
+
+        collected_count = 0
+
+        # Downloads are I/O-bound, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {}
+            for i, url in enumerate(urls):
+                filename = os.path.join(self.save_dir, f"dark_anime_{i+1}.jpg")
+                futures[executor.submit(self.download_image, url, filename)] = filename
+
+            for future in as_completed(futures):
+                filename = futures[future]
+                if not future.result():
+                    continue
+
                 if collected_count >= num_images:
-                    break
-                    
-                filename = os.path.join(self.save_dir, f"dark_anime_{collected_count+1}.jpg")
-                if self.download_image(url, filename):
-                    # Check if the image is dark enough
-                    if self.is_dark_image(filename):
-                        collected_count += 1
-                    else:
-                        print(f"Image not dark enough, removing: {filename}")
-                        os.remove(filename)
-                
-                # Be nice to the server
-                time.sleep(1)
-        
+                    # Already have enough images, discard the extra download
+                    os.remove(filename)
+                    continue
+
+                # Check if the image is dark enough
+                if self.is_dark_image(filename):
+                    collected_count += 1
+                else:
+                    print(f"Image not dark enough, removing: {filename}")
+                    os.remove(filename)
+
         print(f"Collected {collected_count} images.")
         return collected_count
 
@@ -9,6 +9,7 @@ import os
 import random
 import argparse
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 # Ensure the text_overlay_pov module can be imported
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -27,6 +28,20 @@ QUOTES_DIR = os.path.join(BASE_DIR, "quotes")
 IMAGES_DIR = os.path.join(BASE_DIR, "images")
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
 QUOTES_FILE = os.path.join(QUOTES_DIR, "quotes.txt")
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+# Overlay tool for worker processes, created lazily so each process builds
+# its own instance (and keeps its own font/background caches) instead of
+# pickling one across process boundaries
+_worker_overlay = None
+
+def _render_one(task):
+    """Render a single post in a worker process."""
+    global _worker_overlay
+    if _worker_overlay is None:
+        _worker_overlay = POVTextOverlay(output_dir=OUTPUT_DIR)
+    image_path, quote, output_filename = task
+    return _worker_overlay.add_pov_text_to_image(image_path, quote, output_filename)
 
 class ContentPipeline:
     def __init__(self):
@@ -35,8 +50,10 @@ class ContentPipeline:
         self.images = self._find_images()
         # Use the new POVTextOverlay class
         self.overlay_tool = POVTextOverlay(output_dir=OUTPUT_DIR)
-        self.used_quotes = set()
-        self.used_images = set()
+        # Shuffled pools that are popped per selection and refilled when
+        # exhausted, so picking is O(1) with no repeat until a full cycle
+        self._quote_pool = []
+        self._image_pool = []
 
     def _load_quotes(self):
         """Load quotes from the quotes file."""
@@ -60,11 +77,14 @@ class ContentPipeline:
             print("Please create the directory and add background images.")
             return []
         try:
-            images = [
-                os.path.join(IMAGES_DIR, f) 
-                for f in os.listdir(IMAGES_DIR) 
-                if f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))
-            ]
+            # scandir hands back precomputed paths and cached file types,
+            # avoiding a stat call per entry
+            with os.scandir(IMAGES_DIR) as entries:
+                images = [
+                    entry.path
+                    for entry in entries
+                    if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)
+                ]
             if not images:
                 print(f"Warning: No images found in {IMAGES_DIR}. Please add images.")
             return images
@@ -73,34 +93,24 @@ class ContentPipeline:
             return []
 
     def _get_random_quote(self):
-        """Get a random quote, trying not to repeat recently used ones."""
-        available_quotes = [q for q in self.quotes if q not in self.used_quotes]
-        if not available_quotes:
-            # Reset used quotes if all have been used
-            self.used_quotes = set()
-            available_quotes = self.quotes
-        
-        if not available_quotes:
+        """Get a random quote, not repeating any until all have been used."""
+        if not self.quotes:
             return None # No quotes available at all
-            
-        quote = random.choice(available_quotes)
-        self.used_quotes.add(quote)
-        return quote
+        if not self._quote_pool:
+            # All quotes used, refill the pool with a fresh shuffle
+            self._quote_pool = list(self.quotes)
+            random.shuffle(self._quote_pool)
+        return self._quote_pool.pop()
 
     def _get_random_image(self):
-        """Get a random image path, trying not to repeat recently used ones."""
-        available_images = [img for img in self.images if img not in self.used_images]
-        if not available_images:
-            # Reset used images if all have been used
-            self.used_images = set()
-            available_images = self.images
-            
-        if not available_images:
-             return None # No images available at all
-
-        image_path = random.choice(available_images)
-        self.used_images.add(image_path)
-        return image_path
+        """Get a random image path, not repeating any until all have been used."""
+        if not self.images:
+            return None # No images available at all
+        if not self._image_pool:
+            # All images used, refill the pool with a fresh shuffle
+            self._image_pool = list(self.images)
+            random.shuffle(self._image_pool)
+        return self._image_pool.pop()
 
     def generate_content(self, num_posts=3):
         """Generate the specified number of content images using POV style."""
@@ -124,7 +134,9 @@ class ContentPipeline:
                  return
 
         print(f"Starting POV-style content generation for {num_posts} posts...")
-        generated_count = 0
+
+        # Pick all quote/image pairs first so rendering can be dispatched in one batch
+        tasks = []
         for i in range(num_posts):
             quote = self._get_random_quote()
             image_path = self._get_random_image()
@@ -137,13 +149,17 @@ class ContentPipeline:
             output_filename = os.path.join(OUTPUT_DIR, f"post_pov_{i+1:03d}.jpg")
 
             print(f"Generating post {i+1}/{num_posts}: Using image '{os.path.basename(image_path)}'")
-            # Call the new POV style method
-            result_path = self.overlay_tool.add_pov_text_to_image(image_path, quote, output_filename)
+            tasks.append((image_path, quote, output_filename))
 
-            if result_path:
-                generated_count += 1
-            else:
-                print(f"Failed to generate post {i+1}.")
+        # Rendering is CPU-bound (decode, shadow, text raster, JPEG encode),
+        # so spread the posts across worker processes
+        generated_count = 0
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for i, result_path in enumerate(executor.map(_render_one, tasks)):
+                if result_path:
+                    generated_count += 1
+                else:
+                    print(f"Failed to generate post {i+1}.")
 
         print(f"\nContent generation complete. {generated_count}/{num_posts} POV-style posts created in '{OUTPUT_DIR}'.")
 